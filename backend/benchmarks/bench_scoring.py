@@ -0,0 +1,57 @@
+"""
+Throughput benchmark for the answer scoring engine
+
+Run from the backend directory:
+    python -m benchmarks.bench_scoring
+"""
+import random
+import time
+
+from services.question_bank import get_question_bank
+from services.scoring import score_answer, score_answers, get_idf
+
+JOB_DESCRIPTION = (
+    "Senior backend engineer. Build REST APIs with Python, FastAPI and PostgreSQL, "
+    "deploy with Docker and Kubernetes on AWS. Strong communication and teamwork."
+)
+
+ANSWER_WORDS = (
+    "i built python services with fastapi and postgresql deployed them on aws using docker "
+    "and kubernetes we improved latency by caching and profiling um basically like the team "
+    "reviewed designs together communication was key testing and monitoring mattered"
+).split()
+
+
+def make_batch(size, seed=0):
+    rng = random.Random(seed)
+    bank = get_question_bank()
+    questions = [bank.text(rng.randrange(len(bank))) for _ in range(size)]
+    answers = [" ".join(rng.choices(ANSWER_WORDS, k=rng.randint(5, 80))) for _ in range(size)]
+    modes = [rng.choice(["text", "voice"]) for _ in range(size)]
+    return answers, questions, [JOB_DESCRIPTION] * size, modes
+
+
+def bench(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>7} answers  {elapsed * 1000:>9.1f} ms  {count / elapsed:>10.0f} answers/s")
+
+
+def main():
+    get_idf()
+
+    answers, questions, job_descriptions, modes = make_batch(1000)
+    bench(
+        "per-answer (score_answer)",
+        lambda: [score_answer(a, q, j, m) for a, q, j, m in zip(answers, questions, job_descriptions, modes)],
+        len(answers)
+    )
+
+    for size in (1000, 10000, 50000):
+        batch = make_batch(size)
+        bench("batch (score_answers)", lambda: score_answers(*batch), size)
+
+
+if __name__ == "__main__":
+    main()
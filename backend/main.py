@@ -1,6 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import logging
+import uuid
+
+from services.logging_config import setup_logging, shutdown_logging, request_id_var
+
+# Configure logging once, before the routes create their loggers
+setup_logging()
+
 from routes import interview
+from services.question_bank import get_question_bank
+from services.interview_manager import build_session_index
+from services.maintenance import run_maintenance, MAINTENANCE_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
@@ -13,6 +28,43 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+
+@app.middleware("http")
+async def correlation_id_middleware(request: Request, call_next):
+    """Tag every log record of a request with its request id"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+async def maintenance_loop():
+    """Periodic retention pass: temp audio, abandoned sessions, archival"""
+    while True:
+        try:
+            await run_in_threadpool(run_maintenance)
+        except Exception as e:
+            logger.error("Maintenance pass failed: %s", e)
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+
+@app.on_event("startup")
+async def preload():
+    get_question_bank()
+    build_session_index()
+    app.state.maintenance_task = asyncio.create_task(maintenance_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.maintenance_task.cancel()
+    shutdown_logging()
+
+
 app.include_router(interview.router, prefix="/interview", tags=["Interview"])
 
 @app.get("/")
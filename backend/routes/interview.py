@@ -1,60 +1,216 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, HTTPException, UploadFile, File, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import os
 import logging
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 import uuid
+from datetime import datetime
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from services.ai_engine import generate_questions
+from services.ai_engine import generate_questions, generate_question_sets
 from services.interview_manager import (
     create_session,
+    create_sessions,
     get_next_question,
     submit_answer,
     load_session,
-    get_report
+    get_report,
+    rescore_sessions,
+    list_sessions,
+    iter_report_pages,
+    SessionClosed
 )
 from services.speech_to_text import transcribe_audio
+from services.logging_config import bind_session
+from services.admission import AdmissionController, AdmissionRejected
+from services.jd_compactor import get_compaction_stats
+from services.report_export import EXPORT_FORMATS, export_ndjson, export_csv
+from services.session_index import decode_cursor
 
 router = APIRouter()
 
 os.makedirs("temp_audio", exist_ok=True)
 
+# Concurrency limits for the LLM- and STT-heavy endpoints
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+start_admission = AdmissionController(
+    "start",
+    max_concurrent=int(os.getenv("START_MAX_CONCURRENT", "4")),
+    max_queue=int(os.getenv("START_MAX_QUEUE", "16")),
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
+voice_answer_admission = AdmissionController(
+    "voice-answer",
+    max_concurrent=int(os.getenv("VOICE_ANSWER_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("VOICE_ANSWER_MAX_QUEUE", "32")),
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
+
+# Largest cohort accepted by /start-batch, and most distinct question sets per batch
+MAX_BATCH_CANDIDATES = int(os.getenv("MAX_BATCH_CANDIDATES", "200"))
+MAX_QUESTION_SETS = 5
+
+
+def client_key(request: Request):
+    """Identify the client for fair scheduling: explicit header, else remote address"""
+    client_id = request.headers.get("X-Client-ID")
+    if client_id:
+        return client_id
+    return request.client.host if request.client else "unknown"
+
+
+@asynccontextmanager
+async def admitted(controller, request: Request):
+    """Hold an admission slot for the request, or fail fast with 503"""
+    try:
+        await controller.acquire(client_key(request))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy: {e.reason}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        yield
+    finally:
+        controller.release()
+
 
 class InterviewStart(BaseModel):
     job_description: str
 
 
+class CandidateRecord(BaseModel):
+    name: str
+    email: Optional[str] = None
+    external_id: Optional[str] = None
+
+
+class BatchInterviewStart(BaseModel):
+    job_description: str
+    candidates: List[CandidateRecord]
+    question_sets: int = 1
+
+
 @router.post("/start", status_code=status.HTTP_200_OK)
-async def start_interview(data: InterviewStart):
+async def start_interview(data: InterviewStart, request: Request):
     """Start a new interview session"""
-    logger.info(f"Starting interview...")
+    logger.info("Starting interview")
     
-    try:
-        questions = generate_questions(data.job_description)
-        logger.info(f"Generated {len(questions)} questions")
+    async with admitted(start_admission, request):
+        try:
+            questions = await run_in_threadpool(generate_questions, data.job_description)
+            logger.info("Generated %d questions", len(questions), extra={"questions_count": len(questions)})
 
-        session_id = create_session(data.job_description, questions)
-        logger.info(f"Created session: {session_id}")
+            session_id = create_session(data.job_description, questions)
+            bind_session(session_id)
+            logger.info("Created session")
 
-        return {
-            "session_id": session_id,
-            "questions_count": len(questions),
-            "message": "Interview started successfully"
-        }
-    
+            return {
+                "session_id": session_id,
+                "questions_count": len(questions),
+                "message": "Interview started successfully"
+            }
+        
+        except Exception as e:
+            logger.error("Error starting interview: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/start-batch", status_code=status.HTTP_200_OK)
+async def start_interview_batch(data: BatchInterviewStart, request: Request):
+    """Start interview sessions for a cohort of candidates on one posting"""
+    logger.info("Starting batch interview", extra={"candidates": len(data.candidates)})
+
+    if not data.candidates:
+        raise HTTPException(status_code=400, detail="At least one candidate is required")
+    if len(data.candidates) > MAX_BATCH_CANDIDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_CANDIDATES} candidates per batch"
+        )
+    if not 1 <= data.question_sets <= MAX_QUESTION_SETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"question_sets must be between 1 and {MAX_QUESTION_SETS}"
+        )
+
+    async with admitted(start_admission, request):
+        try:
+            set_count = min(data.question_sets, len(data.candidates))
+            question_sets = await run_in_threadpool(generate_question_sets, data.job_description, set_count)
+
+            candidates = [candidate.dict() for candidate in data.candidates]
+            session_ids = await run_in_threadpool(
+                create_sessions, data.job_description, question_sets, candidates
+            )
+            logger.info("Created %d sessions", len(session_ids))
+
+            return {
+                "session_ids": session_ids,
+                "sessions": [
+                    {"session_id": session_id, "candidate": candidate}
+                    for session_id, candidate in zip(session_ids, candidates)
+                ],
+                "question_sets": len(question_sets),
+                "questions_count": len(question_sets[0]),
+                "message": "Interviews started successfully"
+            }
+
+        except Exception as e:
+            logger.error("Error starting batch interview: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/sessions")
+async def search_sessions(
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    jd_hash: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+):
+    """
+    List interview sessions, newest first, filtered through the session index
+    With min_score/max_score the results are ordered by score, highest first
+    """
+    since = _parse_timestamp("since", since)
+    until = _parse_timestamp("until", until)
+    try:
+        sessions, next_cursor = list_sessions(
+            status=status, since=since, until=until,
+            min_score=min_score, max_score=max_score,
+            jd_hash=jd_hash, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error starting interview: {str(e)}")
+        logger.error("Error listing sessions: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "sessions": sessions,
+        "count": len(sessions),
+        "next_cursor": next_cursor
+    }
+
 
 @router.get("/next/{session_id}")
 async def next_question(session_id: str):
     """Get next question"""
-    logger.info(f"Getting next question for session: {session_id}")
+    bind_session(session_id)
+    logger.info("Getting next question")
     
     try:
         question_data = get_next_question(session_id)
@@ -70,94 +226,134 @@ async def next_question(session_id: str):
         else:
             session = load_session(session_id)
             return {
-                "message": "Interview Completed",
+                "message": "Interview Expired" if session["status"] == "expired" else "Interview Completed",
                 "session_id": session_id,
-                "status": "completed",
+                "status": session["status"],
                 "total_questions": len(session["qa"])
             }
     
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Session not found")
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
+        logger.error("Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/voice-answer/{session_id}")
-async def voice_answer(session_id: str, file: UploadFile = File(...)):
+async def voice_answer(session_id: str, request: Request, file: UploadFile = File(...)):
     """Submit voice answer"""
-    logger.info(f"Receiving answer for session: {session_id}")
+    bind_session(session_id)
+    logger.info("Receiving answer")
     
-    try:
-        # Check if this is a text file (from text mode)
-        mode = 'text' if file.filename.endswith('.txt') else 'voice'
+    async with admitted(voice_answer_admission, request):
+        try:
+            # Check if this is a text file (from text mode)
+            mode = 'text' if file.filename.endswith('.txt') else 'voice'
         
-        if mode == 'text':
-            # Text mode
-            content = await file.read()
-            transcript = content.decode('utf-8')
-            logger.info(f"Received text answer: {transcript[:50]}...")
-        else:
-            # Voice mode - save audio file
-            file_extension = os.path.splitext(file.filename)[1]
-            if not file_extension:
-                file_extension = ".webm"
+            if mode == 'text':
+                # Text mode
+                content = await file.read()
+                transcript = content.decode('utf-8')
+                logger.debug("Received text answer: %.50s...", transcript)
+            else:
+                # Voice mode - save audio file
+                file_extension = os.path.splitext(file.filename)[1]
+                if not file_extension:
+                    file_extension = ".webm"
             
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = f"temp_audio/{unique_filename}"
+                unique_filename = f"{uuid.uuid4()}{file_extension}"
+                file_path = f"temp_audio/{unique_filename}"
             
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+                content = await file.read()
+                with open(file_path, "wb") as f:
+                    f.write(content)
             
-            logger.info(f"Saved audio file: {file_path}, size: {len(content)} bytes")
+                logger.info("Saved audio file: %s", file_path, extra={"size_bytes": len(content)})
 
-            # Transcribe audio
-            transcript = transcribe_audio(file_path)
+                # Transcribe audio
+                transcript = await run_in_threadpool(transcribe_audio, file_path)
             
-            # Clean up
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except:
-                pass
-
-        # Submit answer with mode
-        completed = submit_answer(session_id, transcript, mode)
+                # Clean up
+                try:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                except:
+                    pass
+
+            # Submit answer with mode
+            completed = submit_answer(session_id, transcript, mode)
         
-        # Get session info
-        session = load_session(session_id)
-        current_index = session["current_index"]
-        total = len(session["qa"])
+            # Get session info
+            session = load_session(session_id)
+            current_index = session["current_index"]
+            total = len(session["qa"])
         
-        if completed:
-            return {
-                "message": "Interview Completed",
-                "transcript": transcript,
-                "session_id": session_id,
-                "completed": True,
-                "mode": mode
-            }
-        else:
-            return {
-                "message": "Answer Saved",
-                "transcript": transcript,
-                "session_id": session_id,
-                "completed": False,
-                "current_question": current_index,
-                "total_questions": total,
-                "mode": mode
-            }
-    
-    except Exception as e:
-        logger.error(f"Error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+            if completed:
+                return {
+                    "message": "Interview Completed",
+                    "transcript": transcript,
+                    "session_id": session_id,
+                    "completed": True,
+                    "mode": mode
+                }
+            else:
+                return {
+                    "message": "Answer Saved",
+                    "transcript": transcript,
+                    "session_id": session_id,
+                    "completed": False,
+                    "current_question": current_index,
+                    "total_questions": total,
+                    "mode": mode
+                }
+
+        except SessionClosed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Session not found")
+        except Exception as e:
+            logger.error("Error: %s", e)
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/reports/export")
+async def export_reports(
+    format: str = "ndjson",
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+):
+    """
+    Stream completed reports as NDJSON or CSV, in completion order
+    Every record carries a cursor; pass the last one received to resume
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    since = _parse_timestamp("since", since)
+    until = _parse_timestamp("until", until)
+
+    logger.info("Exporting reports", extra={"format": format, "since": since, "until": until})
+
+    pages = iter_report_pages(since=since, until=until, cursor=cursor)
+    body = export_csv(pages, limit) if format == "csv" else export_ndjson(pages, limit)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="reports.{format}"'}
+    )
 
 
 @router.get("/report/{session_id}")
 async def get_interview_report(session_id: str):
     """Get interview report"""
-    logger.info(f"Getting report for session: {session_id}")
+    bind_session(session_id)
+    logger.info("Getting report")
     
     try:
         report = get_report(session_id)
@@ -170,5 +366,51 @@ async def get_interview_report(session_id: str):
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Report not found")
     except Exception as e:
-        logger.error(f"Error: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        logger.error("Error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rescore")
+async def rescore_all_sessions():
+    """Re-score live sessions with the current scoring rules; archived sessions are skipped"""
+    logger.info("Re-scoring stored sessions")
+
+    try:
+        result = await run_in_threadpool(rescore_sessions)
+        logger.info("Re-scored %d answers", result["answers"], extra=result)
+        return result
+
+    except Exception as e:
+        logger.error("Error re-scoring sessions: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admission")
+async def admission_stats():
+    """Queue depth and rejection counts for the admission-controlled endpoints"""
+    return {
+        "start": start_admission.stats(),
+        "voice_answer": voice_answer_admission.stats()
+    }
+
+
+@router.get("/compaction")
+async def compaction_stats():
+    """Token savings from job-description compaction"""
+    return get_compaction_stats()
+
+
+def _parse_timestamp(name, value):
+    """
+    Validate an ISO 8601 query parameter and normalize it to the stored format
+    Stored timestamps are naive local time, so timezone-aware values are converted to it
+    """
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO 8601 timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the Retry-After hint"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, per-client fair wait queue
+    Waiting clients are served round-robin so one client's burst
+    cannot starve everyone else
+    """
+
+    def __init__(self, name, max_concurrent, max_queue, max_queue_per_client=None,
+                 queue_timeout=10.0, retry_after=2):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client or max(1, max_queue // 4)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._active = 0
+        self._queued = 0
+        # client id -> deque of waiting futures, in round-robin order
+        self._waiters = OrderedDict()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self, client_id):
+        """Take a slot, waiting in the client's queue if all slots are busy"""
+        if self._active < self.max_concurrent and not self._queued:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        if self._queued >= self.max_queue:
+            self._reject("queue full", client_id)
+        client_queue = self._waiters.get(client_id)
+        if client_queue and len(client_queue) >= self.max_queue_per_client:
+            self._reject("client queue full", client_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(client_id, deque()).append(future)
+        self._queued += 1
+
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(client_id, future)
+            # The slot may have been handed over right before the timeout fired
+            if future.done() and not future.cancelled():
+                self.release()
+            self.timed_out += 1
+            self.rejected += 1
+            logger.warning("Admission timed out", extra={"endpoint": self.name, "client_id": client_id})
+            raise AdmissionRejected("timed out waiting for capacity", self.retry_after)
+        except asyncio.CancelledError:
+            self._discard(client_id, future)
+            # The slot may have been handed over right before cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+        self.admitted += 1
+
+    def release(self):
+        """Hand the slot to the next waiting client, or free it"""
+        while self._waiters:
+            client_id, client_queue = self._waiters.popitem(last=False)
+            future = client_queue.popleft()
+            self._queued -= 1
+            if client_queue:
+                # Client goes to the back of the round-robin order
+                self._waiters[client_id] = client_queue
+            if not future.done():
+                future.set_result(True)
+                return
+        self._active -= 1
+
+    def stats(self):
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "queued_clients": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def _reject(self, reason, client_id):
+        self.rejected += 1
+        logger.warning("Admission rejected: %s", reason, extra={"endpoint": self.name, "client_id": client_id})
+        raise AdmissionRejected(reason, self.retry_after)
+
+    def _discard(self, client_id, future):
+        client_queue = self._waiters.get(client_id)
+        if client_queue is None:
+            return
+        try:
+            client_queue.remove(future)
+            self._queued -= 1
+        except ValueError:
+            return
+        if not client_queue:
+            del self._waiters[client_id]
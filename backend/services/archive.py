@@ -0,0 +1,172 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from services.session_index import archive_location, index_sessions, mark_archived
+
+logger = logging.getLogger(__name__)
+
+# Completed sessions and their reports are moved into append-only segment files here
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+ARCHIVE_SEGMENT_BYTES = int(os.getenv("ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+
+# Each record is a header (payload length, session id length), the UTF-8 session id,
+# then the zlib-compressed JSON payload, so segments can be re-indexed on their own
+_HEADER = struct.Struct(">IH")
+
+_maps = {}
+_maps_lock = threading.Lock()
+_write_lock = threading.Lock()
+# segment -> end of its last complete record, for segments this process has appended to
+_segment_ends = {}
+
+os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+
+def append_records(records):
+    """
+    Append (session_id, payload) records to the active segment
+    Returns (session_id, segment, offset, length) for each record, once the data is on disk
+    """
+    locations = []
+    with _write_lock:
+        segment = _active_segment()
+        path = os.path.join(ARCHIVE_DIR, segment)
+        if segment not in _segment_ends:
+            _segment_ends[segment] = _complete_end(segment)
+        with open(path, "ab") as f:
+            # Drop a partial record left by a crash so the segment stays scannable
+            f.truncate(_segment_ends[segment])
+            f.seek(0, os.SEEK_END)
+            for session_id, payload in records:
+                blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+                key = session_id.encode('utf-8')
+                f.write(_HEADER.pack(len(blob), len(key)))
+                f.write(key)
+                offset = f.tell()
+                f.write(blob)
+                locations.append((session_id, segment, offset, len(blob)))
+            f.flush()
+            os.fsync(f.fileno())
+            _segment_ends[segment] = f.tell()
+    return locations
+
+
+def read_record(segment, offset, length):
+    """Decode one archived record through a memory map of its segment"""
+    return json.loads(zlib.decompress(_read(segment, offset, length)))
+
+
+def read_records(locations):
+    """Decode many (segment, offset, length) records in segment order; results keep the input order"""
+    records = [None] * len(locations)
+    for position in sorted(range(len(locations)), key=lambda i: locations[i]):
+        records[position] = read_record(*locations[position])
+    return records
+
+
+def load_archived(session_id):
+    """Return the archived {"session", "report"} record, or None if the session is not archived"""
+    location = archive_location(session_id)
+    if location is None:
+        return None
+    return read_record(*location)
+
+
+def iter_records():
+    """
+    Yield (session_id, segment, offset, length) for every record, oldest segment first
+    A session archived twice appears twice; the later record is the current one
+    """
+    for segment in _segments():
+        for session_id, offset, length in _scan(segment):
+            yield session_id, segment, offset, length
+
+
+def rebuild_archive_index(batch_size=500):
+    """Restore index rows and archive locations for every archived session"""
+    sessions = {}
+    locations = {}
+    count = 0
+
+    def flush():
+        nonlocal count
+        index_sessions(list(sessions.values()))
+        mark_archived(list(locations.values()))
+        count += len(sessions)
+        sessions.clear()
+        locations.clear()
+
+    for session_id, segment, offset, length in iter_records():
+        record = read_record(segment, offset, length)
+        sessions[session_id] = dict(record["session"], report=record.get("report"))
+        locations[session_id] = (session_id, segment, offset, length)
+        if len(sessions) >= batch_size:
+            flush()
+    flush()
+
+    logger.info("Restored %d archived sessions into the index", count)
+    return count
+
+
+def _scan(segment):
+    """Yield (session_id, offset, length) for each complete record in a segment"""
+    path = os.path.join(ARCHIVE_DIR, segment)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        position = 0
+        while position + _HEADER.size <= size:
+            length, key_length = _HEADER.unpack(f.read(_HEADER.size))
+            offset = position + _HEADER.size + key_length
+            if offset + length > size:
+                break
+            session_id = f.read(key_length).decode('utf-8')
+            yield session_id, offset, length
+            f.seek(length, os.SEEK_CUR)
+            position = offset + length
+    if position < size:
+        # A write interrupted by a crash leaves a partial record that was never indexed
+        logger.warning("Ignoring %d trailing bytes in archive segment %s", size - position, segment)
+
+
+def _complete_end(segment):
+    path = os.path.join(ARCHIVE_DIR, segment)
+    if not os.path.exists(path):
+        return 0
+    end = 0
+    for _, offset, length in _scan(segment):
+        end = offset + length
+    return end
+
+
+def _segments():
+    return sorted(name for name in os.listdir(ARCHIVE_DIR) if name.endswith(".seg"))
+
+
+def _active_segment():
+    segments = _segments()
+    if segments:
+        latest = segments[-1]
+        if os.path.getsize(os.path.join(ARCHIVE_DIR, latest)) < ARCHIVE_SEGMENT_BYTES:
+            return latest
+        number = int(latest.split("-")[1].split(".")[0]) + 1
+    else:
+        number = 1
+    return f"segment-{number:06d}.seg"
+
+
+def _read(segment, offset, length):
+    """Slice a record out of a cached read-only map, remapping if the segment has grown"""
+    with _maps_lock:
+        segment_map = _maps.get(segment)
+        if segment_map is None or len(segment_map) < offset + length:
+            if segment_map is not None:
+                segment_map.close()
+            with open(os.path.join(ARCHIVE_DIR, segment), "rb") as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _maps[segment] = segment_map
+        return segment_map[offset:offset + length]
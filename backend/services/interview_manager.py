@@ -1,21 +1,95 @@
 import uuid
 import json
 import os
+import logging
 from datetime import datetime
 import random
 
+from services.scoring import score_answer, score_answers, SCORING_BATCH_SIZE
+from services.jd_compactor import job_description_hash
+from services.session_index import (
+    index_session,
+    index_sessions,
+    query_sessions,
+    is_index_empty,
+    rebuild_index,
+    iter_completed_pages
+)
+from services.archive import load_archived, read_records, rebuild_archive_index
+
+logger = logging.getLogger(__name__)
+
 SESSIONS_DIR = "sessions"
 REPORTS_DIR = "reports"
 os.makedirs(SESSIONS_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
-def create_session(job_description, questions):
+# Sessions in these states never change again (and may already be archived)
+FINAL_STATUSES = ("completed", "expired")
+
+
+class SessionClosed(Exception):
+    """Raised when answering a session that is completed or expired"""
+
+    def __init__(self, session_id, status):
+        super().__init__(f"Session is {status}")
+        self.session_id = session_id
+        self.status = status
+
+
+def create_session(job_description, questions, candidate=None):
     """Create a new interview session"""
     session_id = str(uuid.uuid4())
+    session_data = new_session_data(session_id, job_description, questions, candidate)
+
+    save_session(session_id, session_data)
+    return session_id
+
+
+def create_sessions(job_description, question_sets, candidates):
+    """
+    Create one session per candidate in a single bulk write
+    Candidates are assigned question sets round-robin; if any write fails,
+    none of the sessions are kept
+    """
+    sessions = []
+    for i, candidate in enumerate(candidates):
+        session_id = str(uuid.uuid4())
+        questions = question_sets[i % len(question_sets)]
+        sessions.append(new_session_data(session_id, job_description, questions, candidate))
+
+    # Stage every file first, then publish them all with atomic renames
+    staged = []
+    try:
+        for session_data in sessions:
+            final_path = get_path(session_data["session_id"])
+            tmp_path = final_path + ".tmp"
+            staged.append((tmp_path, final_path))
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                json.dump(session_data, f, indent=4, ensure_ascii=False)
+        for tmp_path, final_path in staged:
+            os.replace(tmp_path, final_path)
+    except Exception:
+        for tmp_path, final_path in staged:
+            for path in (tmp_path, final_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        raise
+
+    try:
+        index_sessions(sessions)
+    except Exception as e:
+        logger.error("Failed to index sessions: %s", e)
+
+    return [session_data["session_id"] for session_data in sessions]
 
-    session_data = {
+
+def new_session_data(session_id, job_description, questions, candidate=None):
+    return {
         "session_id": session_id,
         "job_description": job_description,
+        "job_description_hash": job_description_hash(job_description),
+        "candidate": candidate,
         "status": "in_progress",
         "current_index": 0,
         "start_time": datetime.now().isoformat(),
@@ -34,9 +108,6 @@ def create_session(job_description, questions):
         ]
     }
 
-    save_session(session_id, session_data)
-    return session_id
-
 
 def get_path(session_id):
     return f"{SESSIONS_DIR}/{session_id}.json"
@@ -46,16 +117,36 @@ def save_session(session_id, data):
     with open(get_path(session_id), "w", encoding='utf-8') as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
 
+    # The files are the source of truth; a stale index row is fixed by the next write
+    try:
+        index_session(data)
+    except Exception as e:
+        logger.error("Failed to index session %s: %s", session_id, e)
+
 
 def load_session(session_id):
-    with open(get_path(session_id), "r", encoding='utf-8') as f:
-        return json.load(f)
+    try:
+        with open(get_path(session_id), "r", encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Archived sessions are read back from their segment
+        archived = load_archived(session_id)
+        if archived is None:
+            raise
+        session = archived["session"]
+        if archived.get("report"):
+            session["report"] = archived["report"]
+        return session
 
 
 def get_next_question(session_id):
     """Get the next question from the session"""
     session = load_session(session_id)
 
+    if session["status"] in FINAL_STATUSES:
+        # Nothing to write: saving here would revive an archived session into sessions/
+        return None
+
     if session["current_index"] < len(session["qa"]):
         question_data = session["qa"][session["current_index"]]
         return {
@@ -76,16 +167,21 @@ def get_next_question(session_id):
 
 
 def submit_answer(session_id, answer, mode='text'):
-    """Submit answer for current question"""
+    """Submit answer for current question; raises SessionClosed once the session is final"""
     session = load_session(session_id)
 
     index = session["current_index"]
+    if session["status"] in FINAL_STATUSES or index >= len(session["qa"]):
+        raise SessionClosed(session_id, session["status"])
+
     session["qa"][index]["answer"] = answer
     session["qa"][index]["answer_time"] = datetime.now().isoformat()
     session["qa"][index]["answer_mode"] = mode
     
     # Score the answer based on quality
-    score, feedback = evaluate_answer(answer, mode)
+    score, feedback = evaluate_answer(
+        answer, mode, session["qa"][index]["question"], session["job_description"]
+    )
     session["qa"][index]["score"] = score
     session["qa"][index]["feedback"] = feedback
     
@@ -107,45 +203,97 @@ def submit_answer(session_id, answer, mode='text'):
     return False  # Interview still in progress
 
 
-def evaluate_answer(answer, mode='text'):
+def evaluate_answer(answer, mode='text', question="", job_description=""):
     """Evaluate answer quality and provide score and feedback"""
-    
-    # Handle failed audio
-    if "Audio could not be processed" in answer or "Could not understand" in answer:
-        if mode == 'voice':
-            return 30, "Audio not clear. Please try text mode for better results."
-        else:
-            return 20, "No clear answer provided."
-    
-    if not answer or len(answer.strip()) < 5:
-        return 10, "Answer too short. Please provide more details."
-    
-    # Calculate score based on answer length and quality
-    words = len(answer.split())
-    
-    if words < 10:
-        score = random.randint(20, 40)
-        feedback = "Answer too short. Try to provide more details."
-    elif words < 20:
-        score = random.randint(45, 65)
-        feedback = "Good start, but could elaborate more."
-    elif words < 35:
-        score = random.randint(65, 80)
-        feedback = "Good answer with relevant details."
-    else:
-        score = random.randint(80, 98)
-        feedback = "Excellent answer! Very comprehensive."
-    
-    # Add bonus for text mode (more reliable)
-    if mode == 'text':
-        score = min(98, score + 5)
-    
-    return score, feedback
+    return score_answer(answer, question, job_description, mode)
+
+
+def rescore_sessions():
+    """
+    Re-score every stored answer with the current scoring rules in one pass
+    Answers are scored in vectorized batches; reports of completed sessions are refreshed
+    Only live sessions in sessions/ are covered; archived sessions keep their archived scores
+    """
+    answers = []
+    rescored_sessions = 0
+    rescored_answers = 0
+
+    def flush():
+        nonlocal rescored_sessions, rescored_answers
+        if not answers:
+            return
+        results = score_answers(
+            [a["answer"] for a in answers],
+            [a["question"] for a in answers],
+            [a["job_description"] for a in answers],
+            [a["mode"] for a in answers]
+        )
+        new_scores = {}
+        for entry, result in zip(answers, results):
+            new_scores.setdefault(entry["session_id"], {})[entry["question_number"]] = (entry["answer"], result)
+
+        # Sessions may have moved on since they were read: re-read each one right before
+        # writing and merge only score/feedback, for answers that are unchanged
+        for session_id, scored in new_scores.items():
+            try:
+                with open(get_path(session_id), "r", encoding='utf-8') as f:
+                    session = json.load(f)
+            except FileNotFoundError:
+                continue
+            updated = 0
+            for qa in session["qa"]:
+                answer, result = scored.get(qa["question_number"], (None, None))
+                if result and qa["answer"] == answer:
+                    qa["score"], qa["feedback"] = result
+                    updated += 1
+            if not updated:
+                continue
+            save_session(session_id, session)
+            if session["status"] == "completed":
+                refresh_report(session)
+            rescored_sessions += 1
+            rescored_answers += updated
+        answers.clear()
+
+    for entry in sorted(os.scandir(SESSIONS_DIR), key=lambda e: e.name):
+        if not entry.name.endswith(".json"):
+            continue
+        with open(entry.path, "r", encoding='utf-8') as f:
+            session = json.load(f)
+
+        for qa in session["qa"]:
+            if qa["answer"] is None:
+                continue
+            answers.append({
+                "session_id": session["session_id"],
+                "question_number": qa["question_number"],
+                "answer": qa["answer"],
+                "question": qa["question"],
+                "job_description": session["job_description"],
+                "mode": qa["answer_mode"] or "text"
+            })
+        if len(answers) >= SCORING_BATCH_SIZE:
+            flush()
+    flush()
+
+    return {"sessions": rescored_sessions, "answers": rescored_answers}
+
+
+def refresh_report(session):
+    """Regenerate a completed session's report, keeping its non-answer metrics"""
+    previous = session.get("report") or {}
+    report = generate_report(session["session_id"], session)
+    for key in ("eye_contact_score", "confidence_score", "clarity_score"):
+        if key in previous:
+            report[key] = previous[key]
+    save_report(session["session_id"], report, session)
+    return report
 
 
-def generate_report(session_id):
+def generate_report(session_id, session=None):
     """Generate comprehensive interview report"""
-    session = load_session(session_id)
+    if session is None:
+        session = load_session(session_id)
     
     # Get all answers
     qa_list = session["qa"]
@@ -205,7 +353,7 @@ def generate_report(session_id):
     
     report = {
         "session_id": session_id,
-        "candidate_name": "Candidate",
+        "candidate_name": (session.get("candidate") or {}).get("name") or "Candidate",
         "interview_date": session["start_time"],
         "completion_date": session["end_time"] or datetime.now().isoformat(),
         "overall_score": round(avg_score, 1),
@@ -224,14 +372,15 @@ def generate_report(session_id):
     return report
 
 
-def save_report(session_id, report):
+def save_report(session_id, report, session=None):
     """Save report to file"""
     report_path = f"{REPORTS_DIR}/{session_id}.json"
     with open(report_path, "w", encoding='utf-8') as f:
         json.dump(report, f, indent=4, ensure_ascii=False)
     
     # Also save in session
-    session = load_session(session_id)
+    if session is None:
+        session = load_session(session_id)
     session["report"] = report
     save_session(session_id, session)
     
@@ -260,4 +409,58 @@ def get_report(session_id):
     except FileNotFoundError:
         return {"error": "Session not found"}
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+
+def list_sessions(**filters):
+    """Query the session index; see session_index.query_sessions for filters"""
+    return query_sessions(**filters)
+
+
+def build_session_index():
+    """Rebuild an empty or lost index from the archive segments and sessions/"""
+    if is_index_empty():
+        # Live files go last: a session left behind by an interrupted archival keeps its location
+        rebuild_archive_index()
+        rebuild_index(SESSIONS_DIR)
+
+
+def iter_report_pages(since=None, until=None, cursor=None):
+    """
+    Yield lists of (report, cursor) for completed sessions in completion order, one index page each
+    Archived reports are read from their segments in offset order, with no per-report lookup;
+    live reports are one file each and are read individually
+    Stored reports are read as-is; nothing is regenerated
+    """
+    for rows in iter_completed_pages(since=since, until=until, cursor=cursor):
+        archived = [row for row in rows if row["archive_segment"] is not None]
+        records = read_records([
+            (row["archive_segment"], row["archive_offset"], row["archive_length"]) for row in archived
+        ])
+        archived_reports = {
+            row["session_id"]: record.get("report") for row, record in zip(archived, records)
+        }
+
+        page = []
+        for row in rows:
+            session_id = row["session_id"]
+            if session_id in archived_reports:
+                report = archived_reports[session_id]
+            else:
+                report = _read_live_report(session_id)
+            if report:
+                page.append((report, row["cursor"]))
+        if page:
+            yield page
+
+
+def _read_live_report(session_id):
+    try:
+        with open(f"{REPORTS_DIR}/{session_id}.json", "r", encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Archived since the index page was read, or only stored inside the session
+        try:
+            return load_session(session_id).get("report")
+        except FileNotFoundError:
+            return None
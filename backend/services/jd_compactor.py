@@ -0,0 +1,228 @@
+import hashlib
+import html
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from services.keywords import KEYWORD_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+# Approximate token budget for the job description sent to the LLM
+JD_TOKEN_BUDGET = int(os.getenv("JD_TOKEN_BUDGET", "400"))
+JD_CACHE_SIZE = 256
+
+# Section headings whose content never helps question generation
+# Matched against the whole heading
+BOILERPLATE_HEADINGS = {
+    'benefits', 'perks', 'benefits and perks', 'perks and benefits', 'what we offer',
+    'compensation', 'compensation and benefits', 'salary', 'salary and benefits',
+    'about us', 'about the company', 'who we are', 'equal opportunity',
+    'equal opportunity employer', 'eeo', 'eeo statement', 'diversity',
+    'diversity and inclusion', 'legal', 'legal notice', 'disclaimer', 'privacy',
+    'privacy notice', 'how to apply', 'application process', 'accommodation',
+    'accommodations', 'disclosure'
+}
+
+# Sentences that are boilerplate wherever they appear
+BOILERPLATE_PHRASES = [
+    'equal opportunity employer', 'without regard to', 'reasonable accommodation',
+    'privacy policy', 'e-verify', 'apply now', 'click apply', 'background check',
+    'all qualified applicants'
+]
+
+# Skills matter most when choosing which sections to keep
+CATEGORY_WEIGHTS = {
+    'technical': 3,
+    'soft': 1,
+    'role': 1,
+    'experience': 1
+}
+
+# A section under a boilerplate heading is kept only if it names this many skill points
+# (technical and soft skills only; generic role words like "data" or "lead" never count)
+BOILERPLATE_OVERRIDE_SCORE = 6
+OVERRIDE_CATEGORIES = ('technical', 'soft')
+
+# Whole-word keyword patterns, so "paid" is not read as "ai"
+_KEYWORD_PATTERNS = {
+    category: [re.compile(r'(?<!\w)' + re.escape(keyword) + r'(?!\w)') for keyword in vocabulary]
+    for category, vocabulary in KEYWORD_CATEGORIES.items()
+}
+
+_TAG_RE = re.compile(r'<(script|style)[^>]*>.*?</\1>|<[^>]+>', re.IGNORECASE | re.DOTALL)
+_BLOCK_TAG_RE = re.compile(r'<\s*(br|/p|/div|/li|/h[1-6]|/tr)\s*/?>', re.IGNORECASE)
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+_BULLET_RE = re.compile(r'^\s*([-*•●]|\d+[.)])\s*')
+_HEADING_RE = re.compile(r'^\s*(#+\s*)?(?P<title>[^.!?]{2,60}?)\s*:?\s*$')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+_stats = {
+    "compactions": 0,
+    "cache_hits": 0,
+    "tokens_in": 0,
+    "tokens_out": 0,
+    "tokens_saved": 0
+}
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def job_description_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compact_job_description(job_description, token_budget=None):
+    """
+    Shrink a pasted job posting to the parts useful for question generation
+    Results are cached by the hash of the raw text
+    """
+    token_budget = token_budget or JD_TOKEN_BUDGET
+    key = (job_description_hash(job_description), token_budget)
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["cache_hits"] += 1
+            return _cache[key]
+
+    compacted = _compact(job_description, token_budget)
+
+    tokens_in = estimate_tokens(job_description)
+    tokens_out = estimate_tokens(compacted)
+    with _cache_lock:
+        _cache[key] = compacted
+        if len(_cache) > JD_CACHE_SIZE:
+            _cache.popitem(last=False)
+        _stats["compactions"] += 1
+        _stats["tokens_in"] += tokens_in
+        _stats["tokens_out"] += tokens_out
+        _stats["tokens_saved"] += max(0, tokens_in - tokens_out)
+
+    logger.info("Compacted job description", extra={"tokens_in": tokens_in, "tokens_out": tokens_out})
+    return compacted
+
+
+def get_compaction_stats():
+    with _cache_lock:
+        return dict(_stats, cached_entries=len(_cache))
+
+
+def _compact(job_description, token_budget):
+    text = strip_markup(job_description)
+    sections = split_sections(text)
+
+    # Drop boilerplate and repeated sentences across the whole posting
+    seen = set()
+    for section in sections:
+        kept = []
+        for sentence in section["sentences"]:
+            normalized = re.sub(r'\W+', ' ', sentence.lower()).strip()
+            if not normalized or normalized in seen:
+                continue
+            if any(phrase in normalized for phrase in BOILERPLATE_PHRASES):
+                continue
+            seen.add(normalized)
+            kept.append(sentence)
+        section["sentences"] = kept
+        section["score"] = _skill_score(" ".join(kept))
+
+    sections = [
+        s for s in sections
+        if s["sentences"] and (
+            not _is_boilerplate_heading(s["heading"])
+            or _skill_score(" ".join(s["sentences"]), OVERRIDE_CATEGORIES) >= BOILERPLATE_OVERRIDE_SCORE
+        )
+    ]
+    if not sections:
+        return _truncate(text, token_budget)
+
+    # Keep the richest sections within budget, then restore posting order
+    chosen = []
+    remaining = token_budget
+    for section in sorted(sections, key=lambda s: s["score"], reverse=True):
+        lines = ([section["heading"] + ":"] if section["heading"] else []) + section["sentences"]
+        picked = []
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                if not chosen and not picked:
+                    # The richest section opens with an oversized sentence: keep what fits
+                    picked.append(_truncate(line, remaining - 1))
+                    remaining = 0
+                break
+            picked.append(line)
+            remaining -= cost
+        if picked:
+            chosen.append((section["position"], picked))
+        if remaining <= 0:
+            break
+
+    chosen.sort()
+    compacted = "\n".join(line for _, lines in chosen for line in lines).strip()
+    return compacted or _truncate(text, token_budget)
+
+
+def _truncate(text, token_budget):
+    """Cut text at a word boundary so it fits the token budget"""
+    limit = max(1, token_budget) * 4
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(' ')
+    return cut[:space] if space > 0 else cut
+
+
+def strip_markup(text):
+    """Remove HTML tags and entities, keeping line structure"""
+    text = _BLOCK_TAG_RE.sub('\n', text)
+    text = _TAG_RE.sub(' ', text)
+    text = html.unescape(text)
+    text = re.sub(r'[ \t\xa0]+', ' ', text)
+    return re.sub(r'\n\s*\n+', '\n\n', text).strip()
+
+
+def split_sections(text):
+    """Split a posting into heading-delimited sections of sentences"""
+    sections = [{"heading": "", "sentences": [], "position": 0}]
+
+    for raw_line in text.split('\n'):
+        line = _BULLET_RE.sub('', raw_line).strip()
+        if not line:
+            continue
+        heading = _HEADING_RE.match(line)
+        is_heading = heading and (line.endswith(':') or line.lstrip().startswith('#') or line.isupper())
+        if is_heading:
+            sections.append({
+                "heading": heading.group("title").strip(),
+                "sentences": [],
+                "position": len(sections)
+            })
+            continue
+        sections[-1]["sentences"].extend(
+            s.strip() for s in _SENTENCE_RE.split(line) if s.strip()
+        )
+
+    return sections
+
+
+def _is_boilerplate_heading(heading):
+    heading = re.sub(r'[^a-z ]+', ' ', heading.lower())
+    return " ".join(heading.split()) in BOILERPLATE_HEADINGS
+
+
+def _skill_score(text, categories=None):
+    """Weighted count of distinct keywords found as whole words"""
+    text = text.lower()
+    return sum(
+        CATEGORY_WEIGHTS[category] * sum(1 for pattern in _KEYWORD_PATTERNS[category] if pattern.search(text))
+        for category in (categories or CATEGORY_WEIGHTS)
+    )
@@ -0,0 +1,53 @@
+# Technical skills keywords
+TECH_KEYWORDS = [
+    'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node', 'express',
+    'django', 'flask', 'fastapi', 'spring', 'sql', 'mysql', 'postgresql', 'mongodb',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'linux',
+    'html', 'css', 'sass', 'typescript', 'redux', 'webpack', 'rest', 'graphql',
+    'machine learning', 'ai', 'data science', 'tensorflow', 'pytorch', 'pandas',
+    'devops', 'ci/cd', 'terraform', 'ansible', 'prometheus', 'grafana'
+]
+
+# Soft skills keywords
+SOFT_KEYWORDS = [
+    'leadership', 'communication', 'teamwork', 'collaboration', 'problem-solving',
+    'analytical', 'critical thinking', 'time management', 'adaptability', 'flexibility',
+    'creativity', 'innovation', 'mentoring', 'presentation', 'negotiation'
+]
+
+# Role keywords
+ROLE_KEYWORDS = [
+    'developer', 'engineer', 'architect', 'manager', 'lead', 'senior', 'junior',
+    'full stack', 'frontend', 'backend', 'devops', 'data', 'ml', 'ai', 'cloud',
+    'security', 'qa', 'tester', 'analyst', 'consultant'
+]
+
+# Experience level keywords
+EXP_KEYWORDS = [
+    'years of experience', 'experienced', 'expert', 'proficient', 'familiar',
+    'worked on', 'built', 'developed', 'designed', 'implemented', 'managed'
+]
+
+KEYWORD_CATEGORIES = {
+    'technical': TECH_KEYWORDS,
+    'soft': SOFT_KEYWORDS,
+    'role': ROLE_KEYWORDS,
+    'experience': EXP_KEYWORDS
+}
+
+
+def extract_keywords(text):
+    """Extract different types of keywords from job description"""
+
+    text_lower = text.lower()
+
+    extracted = {}
+    for category, vocabulary in KEYWORD_CATEGORIES.items():
+        extracted[category] = [keyword for keyword in vocabulary if keyword in text_lower]
+
+    # Remove duplicates
+    for key in extracted:
+        extracted[key] = list(set(extracted[key]))
+
+    return extracted
+
@@ -0,0 +1,167 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Correlation ids for the current request; set by the HTTP middleware and routes
+request_id_var = contextvars.ContextVar("request_id", default=None)
+session_id_var = contextvars.ContextVar("session_id", default=None)
+
+# Per-logger limits for high-volume messages: logger name -> (messages per second, burst)
+LOG_RATE_LIMITS = {
+    "services.speech_to_text": (5.0, 20),
+}
+
+# Per-logger sampling for high-volume messages: logger name -> fraction kept
+LOG_SAMPLE_RATES = {}
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "session_id",
+}
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def bind_session(session_id):
+    """Attach a session id to every log record emitted for the current request"""
+    session_id_var.set(session_id)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the request/session ids onto the record before it leaves the calling thread"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket rate limiting and random sampling per logger
+    Warnings and errors always pass through
+    """
+
+    def __init__(self, rate_limits=None, sample_rates=None):
+        super().__init__()
+        self.rate_limits = dict(rate_limits or {})
+        self.sample_rates = dict(sample_rates or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        sample_rate = self.sample_rates.get(record.name)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+
+        limit = self.rate_limits.get(record.name)
+        if limit is None:
+            return True
+
+        rate, burst = limit
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(record.name, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now)
+                return False
+            self._buckets[record.name] = (tokens - 1, now)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a record as a single JSON line"""
+
+    def format(self, record):
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "session_id": getattr(record, "session_id", None),
+        }
+
+        # Structured fields passed through `extra=`
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that skips formatting on the calling thread
+    The message is only rendered by the listener thread
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level=None):
+    """
+    Configure root logging once for the whole app
+    Records are queued and written by a background QueueListener thread
+    """
+    global _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        level = level or os.getenv("LOG_LEVEL", "INFO")
+
+        handlers = [logging.StreamHandler(sys.stderr)]
+        log_file = os.getenv("LOG_FILE")
+        if log_file:
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+
+        formatter = JsonFormatter()
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(RateLimitFilter(LOG_RATE_LIMITS, LOG_SAMPLE_RATES))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
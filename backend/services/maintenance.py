@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from services.archive import append_records
+from services.interview_manager import REPORTS_DIR, get_path, save_session
+from services.session_index import find_unarchived, mark_archived, remove_from_index
+
+logger = logging.getLogger(__name__)
+
+TEMP_AUDIO_DIR = "temp_audio"
+
+# Retention settings
+TEMP_AUDIO_TTL_SECONDS = int(os.getenv("TEMP_AUDIO_TTL_SECONDS", "3600"))
+ABANDONED_SESSION_TTL_HOURS = float(os.getenv("ABANDONED_SESSION_TTL_HOURS", "48"))
+ARCHIVE_AFTER_HOURS = float(os.getenv("ARCHIVE_AFTER_HOURS", "24"))
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "900"))
+
+MAINTENANCE_BATCH_SIZE = 500
+
+
+def run_maintenance(now=None):
+    """One maintenance pass: temp audio cleanup, session expiry, archival"""
+    now = now or datetime.now()
+    result = {
+        "temp_audio_deleted": clean_temp_audio(now),
+        "sessions_expired": expire_abandoned_sessions(now),
+        "sessions_archived": archive_finished_sessions(now)
+    }
+    logger.info("Maintenance pass finished", extra=result)
+    return result
+
+
+def clean_temp_audio(now):
+    """Delete temp audio files older than the TTL (left behind by crashed requests)"""
+    if not os.path.isdir(TEMP_AUDIO_DIR):
+        return 0
+
+    cutoff = now.timestamp() - TEMP_AUDIO_TTL_SECONDS
+    deleted = 0
+    for entry in os.scandir(TEMP_AUDIO_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                deleted += 1
+        except FileNotFoundError:
+            continue
+    return deleted
+
+
+def expire_abandoned_sessions(now):
+    """Mark in-progress sessions started before the TTL as expired"""
+    cutoff = (now - timedelta(hours=ABANDONED_SESSION_TTL_HOURS)).isoformat()
+    expired = 0
+
+    while True:
+        session_ids = find_unarchived(["in_progress"], "created_at", cutoff, MAINTENANCE_BATCH_SIZE)
+        for session_id in session_ids:
+            session = _read_session_file(session_id)
+            if session is None:
+                continue
+            session["status"] = "expired"
+            session["end_time"] = now.isoformat()
+            save_session(session_id, session)
+            expired += 1
+        if len(session_ids) < MAINTENANCE_BATCH_SIZE:
+            return expired
+
+
+def archive_finished_sessions(now):
+    """Move completed and expired sessions (with their reports) into archive segments"""
+    cutoff = (now - timedelta(hours=ARCHIVE_AFTER_HOURS)).isoformat()
+    archived = 0
+
+    while True:
+        session_ids = find_unarchived(["completed", "expired"], "completed_at", cutoff, MAINTENANCE_BATCH_SIZE)
+        if not session_ids:
+            return archived
+
+        records = []
+        for session_id in session_ids:
+            session = _read_session_file(session_id)
+            if session is None:
+                continue
+            report = session.pop("report", None)
+            report_path = f"{REPORTS_DIR}/{session_id}.json"
+            if os.path.exists(report_path):
+                with open(report_path, "r", encoding='utf-8') as f:
+                    report = json.load(f)
+            records.append((session_id, {"session": session, "report": report}))
+
+        if records:
+            # Segment data is synced before the index points at it, and files go last
+            locations = append_records(records)
+            mark_archived(locations)
+            for session_id, _ in records:
+                for path in (get_path(session_id), f"{REPORTS_DIR}/{session_id}.json"):
+                    if os.path.exists(path):
+                        os.remove(path)
+            archived += len(records)
+
+
+def _read_session_file(session_id):
+    """Read a live session file; index rows whose file is gone are dropped"""
+    try:
+        with open(get_path(session_id), "r", encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("Session file missing, removing from index: %s", session_id)
+        remove_from_index([session_id])
+        return None
@@ -0,0 +1,246 @@
+import json
+import logging
+import mmap
+import os
+import random
+import threading
+from array import array
+from collections import defaultdict
+
+from services.keywords import TECH_KEYWORDS, SOFT_KEYWORDS, ROLE_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "question_templates.json")
+
+# Optional pre-expanded bank (JSONL, one {"question", "tags"} per line), memory-mapped
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH")
+
+SENIORITY_LEVELS = ['senior', 'junior', 'lead']
+
+# Job description words that switch on a context tag
+CONTEXT_TRIGGERS = {
+    'team': ['team', 'collaborate'],
+    'deadline': ['deadline', 'fast-paced'],
+    'customer': ['customer', 'client'],
+    'startup': ['startup', 'fast-growing'],
+    'legacy': ['legacy', 'existing'],
+    'mentor': ['mentor', 'guide'],
+    'agile': ['agile', 'scrum'],
+    'remote': ['remote', 'distributed']
+}
+
+# How much a matching tag contributes to a question's rank
+TAG_WEIGHTS = {
+    'skill': 3.0,
+    'seniority': 2.0,
+    'role': 1.5,
+    'soft': 1.5,
+    'context': 1.0,
+    'general': 0.1
+}
+
+# At most this many selected questions may share the same primary tag
+MAX_PER_TAG = 1
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+class QuestionBank:
+    """
+    Question templates indexed by tag ("skill:python", "seniority:senior", ...)
+    Question text is either held in memory or read lazily from a memory-mapped JSONL file
+    """
+
+    def __init__(self):
+        self._texts = []
+        self._offsets = None
+        self._mmap = None
+        self._primary_tags = []
+        self._index = defaultdict(list)
+
+    def __len__(self):
+        return len(self._primary_tags)
+
+    @classmethod
+    def from_templates(cls, path=TEMPLATES_PATH):
+        """Expand the tagged template file against the keyword vocabulary"""
+        with open(path, "r", encoding='utf-8') as f:
+            templates = json.load(f)
+
+        bank = cls()
+        for skill in TECH_KEYWORDS:
+            for template in templates["skill"]:
+                bank._add(template.format(skill=skill), [f"skill:{skill}"])
+            for level, level_templates in templates["skill_seniority"].items():
+                for template in level_templates:
+                    bank._add(template.format(skill=skill), [f"skill:{skill}", skill_level_tag(skill, level)])
+
+        for role in ROLE_KEYWORDS:
+            if role in SENIORITY_LEVELS:
+                continue
+            for template in templates["role"]:
+                bank._add(template.format(role=role), [f"role:{role}"])
+
+        for soft in SOFT_KEYWORDS:
+            for template in templates["soft"]:
+                bank._add(template.format(soft=soft), [f"soft:{soft}"])
+
+        for level, level_templates in templates["seniority"].items():
+            for template in level_templates:
+                bank._add(template, [f"seniority:{level}"])
+
+        for context, context_templates in templates["context"].items():
+            for template in context_templates:
+                bank._add(template, [f"context:{context}"])
+
+        for template in templates["general"]:
+            bank._add(template, ["general"])
+
+        return bank
+
+    @classmethod
+    def from_jsonl(cls, path):
+        """Index a large JSONL bank; question text stays in the memory-mapped file"""
+        bank = cls()
+        bank._offsets = array('q')
+
+        with open(path, "rb") as f:
+            bank._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        position = 0
+        size = len(bank._mmap)
+        while position < size:
+            end = bank._mmap.find(b"\n", position)
+            if end == -1:
+                end = size
+            line = bank._mmap[position:end]
+            if line.strip():
+                entry = json.loads(line)
+                question_id = len(bank._primary_tags)
+                bank._offsets.append(position)
+                bank._offsets.append(end)
+                bank._primary_tags.append(entry["tags"][0])
+                for tag in entry["tags"]:
+                    bank._index[tag].append(question_id)
+            position = end + 1
+
+        return bank
+
+    def dump_jsonl(self, path):
+        """Write the bank in the JSONL format read by from_jsonl"""
+        tags_by_id = defaultdict(list)
+        for tag, question_ids in self._index.items():
+            for question_id in question_ids:
+                tags_by_id[question_id].append(tag)
+
+        with open(path, "w", encoding='utf-8') as f:
+            for question_id in range(len(self)):
+                tags = sorted(tags_by_id[question_id], key=lambda t: t != self._primary_tags[question_id])
+                f.write(json.dumps({"question": self.text(question_id), "tags": tags}, ensure_ascii=False))
+                f.write("\n")
+
+    def text(self, question_id):
+        if self._mmap is None:
+            return self._texts[question_id]
+        start = self._offsets[2 * question_id]
+        end = self._offsets[2 * question_id + 1]
+        return json.loads(self._mmap[start:end])["question"]
+
+    def select(self, tags, n=5, seed=None, exclude=()):
+        """
+        Return the top-n distinct questions for the given tags
+        Ties are broken randomly; pass a seed for a deterministic result
+        """
+        rng = random.Random(seed)
+
+        # Tags and question ids are walked in sorted order so a seed gives the same
+        # result in every process, whatever the string hash seed
+        scores = defaultdict(float)
+        for tag in sorted(set(tags) | {"general"}):
+            weight = TAG_WEIGHTS.get(tag.split(":", 1)[0], 1.0)
+            for question_id in self._index.get(tag, ()):
+                scores[question_id] += weight
+
+        tie_breaks = {question_id: rng.random() for question_id in sorted(scores)}
+        ranked = sorted(scores, key=lambda qid: (-scores[qid], tie_breaks[qid]))
+
+        selected = []
+        seen = {q.strip().lower() for q in exclude}
+        per_tag = defaultdict(int)
+        overflow = []
+        for question_id in ranked:
+            if len(selected) >= n:
+                break
+            text = self.text(question_id)
+            normalized = text.strip().lower()
+            if normalized in seen:
+                continue
+            primary = self._primary_tags[question_id]
+            if per_tag[primary] >= MAX_PER_TAG:
+                overflow.append((normalized, text))
+                continue
+            seen.add(normalized)
+            per_tag[primary] += 1
+            selected.append(text)
+
+        # Not enough variety in the tags: relax the per-tag cap
+        for normalized, text in overflow:
+            if len(selected) >= n:
+                break
+            if normalized not in seen:
+                seen.add(normalized)
+                selected.append(text)
+
+        return selected
+
+    def _add(self, text, tags):
+        question_id = len(self._primary_tags)
+        self._texts.append(text)
+        self._primary_tags.append(tags[0])
+        for tag in tags:
+            self._index[tag].append(question_id)
+
+
+def get_question_bank():
+    """Load the question bank once per process"""
+    global _bank
+
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                if QUESTION_BANK_PATH:
+                    _bank = QuestionBank.from_jsonl(QUESTION_BANK_PATH)
+                else:
+                    _bank = QuestionBank.from_templates()
+                logger.info("Loaded question bank with %d questions", len(_bank))
+    return _bank
+
+
+def tags_for(keywords, job_description):
+    """Turn extracted keywords and job description context into bank tags"""
+    levels = [role for role in keywords['role'] if role in SENIORITY_LEVELS]
+
+    tags = [f"skill:{skill}" for skill in keywords['technical']]
+    tags += [skill_level_tag(skill, level) for skill in keywords['technical'] for level in levels]
+    tags += [f"seniority:{level}" for level in levels]
+    tags += [f"role:{role}" for role in keywords['role'] if role not in SENIORITY_LEVELS]
+    tags += [f"soft:{soft}" for soft in keywords['soft']]
+    tags += context_tags(job_description)
+
+    return tags
+
+
+def skill_level_tag(skill, level):
+    """Tag for questions that only fit a skill at a given seniority"""
+    return f"skill:{skill}@{level}"
+
+
+def context_tags(job_description):
+    text_lower = job_description.lower()
+    return [
+        f"context:{context}"
+        for context, triggers in CONTEXT_TRIGGERS.items()
+        if any(trigger in text_lower for trigger in triggers)
+    ]
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+CSV_COLUMNS = [
+    "session_id", "candidate_name", "interview_date", "completion_date",
+    "overall_score", "eye_contact_score", "confidence_score", "clarity_score",
+    "total_questions", "answered_questions", "recommendation", "summary",
+    "strengths", "weaknesses", "question_analysis", "cursor"
+]
+
+
+def export_ndjson(pages, limit=None):
+    """One JSON report per line, one chunk per page; each line carries the cursor to resume after it"""
+    for page in _limit_pages(pages, limit):
+        yield "".join(json.dumps(dict(report, cursor=cursor), ensure_ascii=False) + "\n" for report, cursor in page)
+
+
+def export_csv(pages, limit=None):
+    """Flat CSV rows, one chunk per page; list fields are joined and question analysis is embedded as JSON"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+
+    writer.writeheader()
+    yield _drain(buffer)
+
+    for page in _limit_pages(pages, limit):
+        for report, cursor in page:
+            row = dict(report, cursor=cursor)
+            row["strengths"] = "; ".join(report.get("strengths", []))
+            row["weaknesses"] = "; ".join(report.get("weaknesses", []))
+            row["question_analysis"] = json.dumps(report.get("question_analysis", []), ensure_ascii=False)
+            writer.writerow(row)
+        yield _drain(buffer)
+
+
+def _limit_pages(pages, limit):
+    """Pass pages through, cutting the last one short once limit records have been sent"""
+    sent = 0
+    for page in pages:
+        if limit:
+            page = page[:limit - sent]
+        if page:
+            yield page
+        sent += len(page)
+        if limit and sent >= limit:
+            return
+
+
+def _drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
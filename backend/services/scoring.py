@@ -0,0 +1,255 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from services.keywords import extract_keywords
+from services.question_bank import get_question_bank
+
+# Tokens are hashed into this many feature columns
+HASH_DIM = 2 ** 18
+
+# Answers are scored in chunks of this size to bound memory
+SCORING_BATCH_SIZE = 8192
+
+# Weights of the answer features in the final score
+SCORING_WEIGHTS = {
+    "length": 0.45,
+    "relevance": 0.35,
+    "keywords": 0.20
+}
+
+# Answers of this many words get the full length score
+FULL_LENGTH_WORDS = 40
+
+# TF-IDF cosine similarity that counts as fully on-topic
+FULL_RELEVANCE_SIMILARITY = 0.25
+
+# Filler-word ratio tolerated before the score is penalized
+FILLER_TOLERANCE = 0.05
+
+FILLER_WORDS = {
+    'um', 'umm', 'uh', 'uhh', 'er', 'ah', 'hmm', 'like', 'basically', 'actually',
+    'literally', 'kinda', 'sorta', 'whatever', 'yeah'
+}
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'to', 'in', 'on', 'at', 'for',
+    'with', 'by', 'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its',
+    'this', 'that', 'these', 'those', 'i', 'you', 'we', 'they', 'he', 'she', 'me', 'my',
+    'your', 'our', 'their', 'do', 'did', 'does', 'have', 'has', 'had', 'can', 'could',
+    'would', 'should', 'will', 'what', 'how', 'when', 'where', 'which', 'who', 'why',
+    'about', 'so', 'not', 'no', 'yes', 'there', 'here', 'then', 'than', 'also'
+}
+
+FEEDBACK = [
+    "Answer too short. Try to provide more details.",
+    "Answer doesn't address the question closely. Stay focused on what was asked.",
+    "Try to reduce filler words for a clearer answer.",
+    "Excellent answer! Very comprehensive.",
+    "Good answer with relevant details.",
+    "Good start, but could elaborate more."
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#/]+")
+
+_bucket_cache = {}
+_keyword_cache = {}
+_idf = None
+_idf_lock = threading.Lock()
+
+
+def score_answer(answer, question="", job_description="", mode='text'):
+    """Score a single answer; returns (score, feedback)"""
+    return score_answers([answer], [question], [job_description], [mode])[0]
+
+
+def score_answers(answers, questions, job_descriptions, modes):
+    """
+    Score many answers at once
+    All inputs are parallel lists; returns a list of (score, feedback) tuples
+    """
+    results = []
+    for start in range(0, len(answers), SCORING_BATCH_SIZE):
+        end = start + SCORING_BATCH_SIZE
+        results.extend(_score_chunk(
+            answers[start:end], questions[start:end], job_descriptions[start:end], modes[start:end]
+        ))
+    return results
+
+
+def answer_features(answers, questions, job_descriptions):
+    """
+    Relevance and delivery features for a batch of answers
+    Returns a dict of NumPy arrays, one entry per answer
+    """
+    n = len(answers)
+    answer_tokens = [tokenize(answer or "") for answer in answers]
+    question_tokens = [content_tokens(tokenize(question or "")) for question in questions]
+    keyword_tokens = [
+        _keyword_tokens(question or "", job_description or "")
+        for question, job_description in zip(questions, job_descriptions)
+    ]
+
+    words = np.fromiter((len(tokens) for tokens in answer_tokens), dtype=np.float32, count=n)
+    fillers = np.fromiter(
+        (sum(1 for t in tokens if t in FILLER_WORDS) for tokens in answer_tokens),
+        dtype=np.float32, count=n
+    )
+    filler_ratio = fillers / np.maximum(words, 1)
+
+    answer_terms = _term_matrix([content_tokens(tokens) for tokens in answer_tokens])
+    question_terms = _term_matrix(question_tokens)
+    keyword_terms = _term_matrix(keyword_tokens)
+
+    # TF-IDF cosine similarity between each answer and its question
+    idf = get_idf()
+    answer_weights = np.log1p(answer_terms[2]) * idf[answer_terms[1]]
+    question_weights = np.log1p(question_terms[2]) * idf[question_terms[1]]
+    _, in_answer, in_question = np.intersect1d(
+        answer_terms[0], question_terms[0], assume_unique=True, return_indices=True
+    )
+    rows = answer_terms[0][in_answer] // HASH_DIM
+    dot = np.bincount(rows, answer_weights[in_answer] * question_weights[in_question], minlength=n)
+    norms = (
+        np.sqrt(np.bincount(answer_terms[0] // HASH_DIM, answer_weights ** 2, minlength=n))
+        * np.sqrt(np.bincount(question_terms[0] // HASH_DIM, question_weights ** 2, minlength=n))
+    )
+    similarity = np.divide(dot, norms, out=np.zeros(n), where=norms > 0)
+
+    # Share of question/job-description keywords the answer mentions
+    keyword_total = np.bincount(keyword_terms[0] // HASH_DIM, minlength=n)
+    matched = np.intersect1d(answer_terms[0], keyword_terms[0], assume_unique=True)
+    keyword_hits = np.bincount(matched // HASH_DIM, minlength=n)
+    keyword_overlap = np.divide(
+        keyword_hits, keyword_total, out=np.full(n, np.nan), where=keyword_total > 0
+    )
+
+    return {
+        "words": words,
+        "filler_ratio": filler_ratio,
+        "question_similarity": similarity,
+        "keyword_overlap": keyword_overlap
+    }
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def content_tokens(tokens):
+    return [t for t in tokens if t not in STOPWORDS and t not in FILLER_WORDS]
+
+
+def get_idf():
+    """Inverse document frequencies over the question bank, computed once"""
+    global _idf
+
+    if _idf is None:
+        with _idf_lock:
+            if _idf is None:
+                bank = get_question_bank()
+                document_frequency = np.zeros(HASH_DIM)
+                for question_id in range(len(bank)):
+                    buckets = {_bucket(t) for t in content_tokens(tokenize(bank.text(question_id)))}
+                    document_frequency[list(buckets)] += 1
+                documents = len(bank)
+                _idf = np.log((1 + documents) / (1 + document_frequency)) + 1
+    return _idf
+
+
+def _score_chunk(answers, questions, job_descriptions, modes):
+    features = answer_features(answers, questions, job_descriptions)
+
+    words = features["words"]
+    length = np.clip(words / FULL_LENGTH_WORDS, 0, 1)
+    relevance = np.clip(features["question_similarity"] / FULL_RELEVANCE_SIMILARITY, 0, 1)
+    # Without keywords to look for, fall back on question relevance
+    keywords = np.where(np.isnan(features["keyword_overlap"]), relevance, features["keyword_overlap"])
+    on_topic = np.maximum(relevance, keywords)
+    filler_penalty = np.clip((features["filler_ratio"] - FILLER_TOLERANCE) * 2, 0, 0.3)
+
+    # Content only earns credit in proportion to length, so a few matching words
+    # cannot outscore a developed answer (answers under 10 words stay below ~45)
+    content = SCORING_WEIGHTS["relevance"] * relevance + SCORING_WEIGHTS["keywords"] * keywords
+    raw = SCORING_WEIGHTS["length"] * length + length * content - filler_penalty
+    scores = np.clip(np.rint(20 + 78 * raw), 10, 98)
+
+    # Text answers are more reliable than transcripts
+    is_text = np.array([mode == 'text' for mode in modes], dtype=bool)
+    scores = np.where(is_text, np.minimum(98, scores + 5), scores).astype(int)
+
+    feedback_index = np.select(
+        [
+            words < 10,
+            on_topic < 0.3,
+            features["filler_ratio"] > 0.1,
+            scores >= 80,
+            scores >= 65
+        ],
+        [0, 1, 2, 3, 4],
+        default=5
+    )
+
+    results = []
+    for answer, mode, score, index in zip(answers, modes, scores.tolist(), feedback_index.tolist()):
+        special = _special_case(answer, mode)
+        results.append(special if special else (score, FEEDBACK[index]))
+    return results
+
+
+def _special_case(answer, mode):
+    """Failed transcriptions and empty answers keep their fixed scores"""
+    if answer and ("Audio could not be processed" in answer or "Could not understand" in answer):
+        if mode == 'voice':
+            return 30, "Audio not clear. Please try text mode for better results."
+        return 20, "No clear answer provided."
+
+    if not answer or len(answer.strip()) < 5:
+        return 10, "Answer too short. Please provide more details."
+
+    return None
+
+
+def _term_matrix(token_lists):
+    """
+    Sparse hashed term counts, one row per token list
+    Returns (keys, columns, counts) where key = row * HASH_DIM + column, sorted and unique
+    """
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    rows = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+    columns = np.fromiter(
+        (_bucket(t) for tokens in token_lists for t in tokens), dtype=np.int64, count=int(lengths.sum())
+    )
+
+    keys, counts = np.unique(rows * HASH_DIM + columns, return_counts=True)
+    return keys, keys % HASH_DIM, counts
+
+
+def _bucket(token):
+    bucket = _bucket_cache.get(token)
+    if bucket is None:
+        bucket = zlib.crc32(token.encode('utf-8')) % HASH_DIM
+        if len(_bucket_cache) < 100000:
+            _bucket_cache[token] = bucket
+    return bucket
+
+
+def _keyword_tokens(question, job_description):
+    """Tokens of the technical and soft-skill keywords in the question and job description"""
+    key = (question, job_description)
+    cached = _keyword_cache.get(key)
+    if cached is not None:
+        return cached
+
+    found = set()
+    for text in (question, job_description):
+        keywords = extract_keywords(text)
+        for keyword in keywords['technical'] + keywords['soft']:
+            found.update(tokenize(keyword))
+
+    tokens = content_tokens(sorted(found))
+    if len(_keyword_cache) < 2048:
+        _keyword_cache[key] = tokens
+    return tokens
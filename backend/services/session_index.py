@@ -0,0 +1,282 @@
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from services.jd_compactor import job_description_hash
+
+logger = logging.getLogger(__name__)
+
+# Secondary indexes over sessions/ and reports/, kept up to date on every write
+SESSION_INDEX_PATH = os.getenv("SESSION_INDEX_PATH", "session_index.db")
+
+MAX_PAGE_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    score REAL,
+    jd_hash TEXT NOT NULL,
+    candidate_name TEXT,
+    total_questions INTEGER NOT NULL,
+    answered_questions INTEGER NOT NULL,
+    archive_segment TEXT,
+    archive_offset INTEGER,
+    archive_length INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at, session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions (status, created_at, session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_jd ON sessions (jd_hash, created_at, session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_score ON sessions (score, created_at, session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_completed ON sessions (status, completed_at, session_id);
+"""
+
+_UPSERT = """
+INSERT INTO sessions (
+    session_id, status, created_at, completed_at, score, jd_hash,
+    candidate_name, total_questions, answered_questions
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    status = excluded.status,
+    completed_at = excluded.completed_at,
+    score = excluded.score,
+    candidate_name = excluded.candidate_name,
+    total_questions = excluded.total_questions,
+    answered_questions = excluded.answered_questions
+"""
+
+_local = threading.local()
+
+
+def get_connection():
+    """One connection per thread; the schema is created on first use"""
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(SESSION_INDEX_PATH, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        _migrate(connection)
+        _local.connection = connection
+    return connection
+
+
+def _migrate(connection):
+    """Add columns introduced after the table was first created"""
+    columns = {row["name"] for row in connection.execute("PRAGMA table_info(sessions)")}
+    with connection:
+        for column, column_type in (
+            ("archive_segment", "TEXT"), ("archive_offset", "INTEGER"), ("archive_length", "INTEGER")
+        ):
+            if column not in columns:
+                connection.execute(f"ALTER TABLE sessions ADD COLUMN {column} {column_type}")
+
+
+def index_session(session):
+    """Insert or update the index row for a session"""
+    index_sessions([session])
+
+
+def index_sessions(sessions):
+    """Index many sessions in a single transaction"""
+    connection = get_connection()
+    with connection:
+        connection.executemany(_UPSERT, [_row(session) for session in sessions])
+
+
+def remove_from_index(session_ids):
+    connection = get_connection()
+    with connection:
+        connection.executemany(
+            "DELETE FROM sessions WHERE session_id = ?", [(session_id,) for session_id in session_ids]
+        )
+
+
+def query_sessions(status=None, since=None, until=None, min_score=None, max_score=None,
+                   jd_hash=None, limit=50, cursor=None):
+    """
+    Filter indexed sessions with keyset pagination
+    Results are newest first; with a score filter they are ordered by score (highest first),
+    then newest, so the score range is read straight from idx_sessions_score
+    Returns (rows, next_cursor); next_cursor is None on the last page
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    by_score = min_score is not None or max_score is not None
+    order_columns = ["score", "created_at", "session_id"] if by_score else ["created_at", "session_id"]
+    clauses = []
+    params = []
+
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(since)
+    if until:
+        clauses.append("created_at < ?")
+        params.append(until)
+    if min_score is not None:
+        clauses.append("score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append("score <= ?")
+        params.append(max_score)
+    if jd_hash:
+        clauses.append("jd_hash = ?")
+        params.append(jd_hash)
+    if cursor:
+        position = decode_cursor(cursor, len(order_columns))
+        clauses.append(f"({', '.join(order_columns)}) < ({', '.join('?' for _ in order_columns)})")
+        params.extend(position)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = ", ".join(f"{column} DESC" for column in order_columns)
+    rows = get_connection().execute(
+        f"SELECT * FROM sessions {where} ORDER BY {order} LIMIT ?",
+        params + [limit + 1]
+    ).fetchall()
+
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(*(last[column] for column in order_columns))
+    return items, next_cursor
+
+
+def find_unarchived(statuses, column, before, limit=500):
+    """Session ids in the given statuses whose created_at/completed_at is before a cutoff"""
+    if column not in ("created_at", "completed_at"):
+        raise ValueError(f"Unsupported column: {column}")
+
+    placeholders = ", ".join("?" for _ in statuses)
+    rows = get_connection().execute(
+        f"SELECT session_id FROM sessions WHERE status IN ({placeholders}) "
+        f"AND archive_segment IS NULL AND {column} < ? ORDER BY {column} LIMIT ?",
+        list(statuses) + [before, limit]
+    ).fetchall()
+    return [row["session_id"] for row in rows]
+
+
+def mark_archived(locations):
+    """Record where archived sessions live: (session_id, segment, offset, length) tuples"""
+    connection = get_connection()
+    with connection:
+        connection.executemany(
+            "UPDATE sessions SET archive_segment = ?, archive_offset = ?, archive_length = ? "
+            "WHERE session_id = ?",
+            [(segment, offset, length, session_id) for session_id, segment, offset, length in locations]
+        )
+
+
+def archive_location(session_id):
+    """(segment, offset, length) for an archived session, else None"""
+    row = get_connection().execute(
+        "SELECT archive_segment, archive_offset, archive_length FROM sessions WHERE session_id = ?",
+        (session_id,)
+    ).fetchone()
+    if row is None or row["archive_segment"] is None:
+        return None
+    return row["archive_segment"], row["archive_offset"], row["archive_length"]
+
+
+def iter_completed_pages(since=None, until=None, cursor=None, page_size=500):
+    """
+    Yield completed sessions oldest-completed first, as one list of rows per index page
+    Each row has the session id, its archive location (if any) and the cursor that
+    resumes the iteration right after it
+    """
+    position = decode_cursor(cursor) if cursor else None
+
+    while True:
+        clauses = ["status = 'completed'", "completed_at IS NOT NULL"]
+        params = []
+        if since:
+            clauses.append("completed_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("completed_at < ?")
+            params.append(until)
+        if position:
+            clauses.append("(completed_at, session_id) > (?, ?)")
+            params.extend(position)
+
+        rows = get_connection().execute(
+            "SELECT session_id, completed_at, archive_segment, archive_offset, archive_length "
+            f"FROM sessions WHERE {' AND '.join(clauses)} ORDER BY completed_at, session_id LIMIT ?",
+            params + [page_size]
+        ).fetchall()
+
+        if rows:
+            yield [
+                dict(row, cursor=encode_cursor(row["completed_at"], row["session_id"]))
+                for row in rows
+            ]
+        if len(rows) < page_size:
+            return
+        position = (rows[-1]["completed_at"], rows[-1]["session_id"])
+
+
+def encode_cursor(*position):
+    return base64.urlsafe_b64encode(json.dumps(list(position)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, size=2):
+    """Raises ValueError for a malformed cursor"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, list) or len(position) != size:
+        raise ValueError("Invalid cursor")
+    return tuple(position)
+
+
+def rebuild_index(sessions_dir):
+    """Re-index every session file; used to bootstrap an empty or lost index"""
+    batch = []
+    count = 0
+    for entry in os.scandir(sessions_dir):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path, "r", encoding='utf-8') as f:
+                batch.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.error("Skipping unreadable session file %s: %s", entry.name, e)
+            continue
+        if len(batch) >= 500:
+            index_sessions(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        index_sessions(batch)
+        count += len(batch)
+
+    logger.info("Rebuilt session index with %d sessions", count)
+    return count
+
+
+def is_index_empty():
+    return get_connection().execute("SELECT 1 FROM sessions LIMIT 1").fetchone() is None
+
+
+def _row(session):
+    report = session.get("report") or {}
+    return (
+        session["session_id"],
+        session["status"],
+        session["start_time"],
+        session.get("end_time"),
+        report.get("overall_score"),
+        session.get("job_description_hash") or job_description_hash(session["job_description"]),
+        (session.get("candidate") or {}).get("name"),
+        len(session["qa"]),
+        len([qa for qa in session["qa"] if qa["answer"]])
+    )
@@ -6,8 +6,6 @@ import subprocess
 import wave
 import contextlib
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def transcribe_audio(file_path):
@@ -15,11 +13,11 @@ def transcribe_audio(file_path):
     Convert audio file to text using Google Speech Recognition
     Handles multiple audio formats
     """
-    logger.info(f"Transcribing audio file: {file_path}")
+    logger.info("Transcribing audio file: %s", file_path)
     
     # Check if file exists
     if not os.path.exists(file_path):
-        logger.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         return "Audio file not found"
     
     # Check file size
@@ -28,7 +26,7 @@ def transcribe_audio(file_path):
         logger.error("Empty audio file")
         return "Empty audio file"
     
-    logger.info(f"File size: {file_size} bytes")
+    logger.info("File size: %d bytes", file_size, extra={"size_bytes": file_size})
     
     # If it's a text file (from text mode), just read it
     if file_path.endswith('.txt'):
@@ -36,12 +34,12 @@ def transcribe_audio(file_path):
             with open(file_path, 'r', encoding='utf-8') as f:
                 text = f.read().strip()
                 if text:
-                    logger.info(f"Read text from file: {text[:50]}...")
+                    logger.debug("Read text from file: %.50s...", text)
                     return text
                 else:
                     return "Empty text"
         except Exception as e:
-            logger.error(f"Error reading text file: {e}")
+            logger.error("Error reading text file: %s", e)
             return "Could not read text file"
     
     # For audio files, try multiple methods
@@ -79,17 +77,17 @@ def transcribe_direct(file_path):
             
             # Recognize speech
             text = recognizer.recognize_google(audio)
-            logger.info(f"Direct transcription successful: '{text[:50]}...'")
+            logger.debug("Direct transcription successful: '%.50s...'", text)
             return text
             
     except sr.UnknownValueError:
         logger.warning("Could not understand audio in direct mode")
         return None
     except sr.RequestError as e:
-        logger.error(f"Speech recognition service error: {e}")
+        logger.error("Speech recognition service error: %s", e)
         return None
     except Exception as e:
-        logger.error(f"Direct transcription error: {e}")
+        logger.error("Direct transcription error: %s", e)
         return None
 
 
@@ -108,7 +106,7 @@ def transcribe_with_ffmpeg(file_path):
             return None
         
         # Convert to WAV with specific parameters
-        logger.info(f"Converting {file_path} to WAV")
+        logger.info("Converting %s to WAV", file_path)
         result = subprocess.run([
             "ffmpeg",
             "-y",
@@ -121,7 +119,7 @@ def transcribe_with_ffmpeg(file_path):
         ], capture_output=True, text=True)
         
         if result.returncode != 0:
-            logger.error(f"FFmpeg conversion failed: {result.stderr}")
+            logger.error("FFmpeg conversion failed: %s", result.stderr)
             return None
         
         # Check if converted file exists and has content
@@ -135,14 +133,14 @@ def transcribe_with_ffmpeg(file_path):
             audio = recognizer.record(source)
             text = recognizer.recognize_google(audio)
             
-        logger.info(f"FFmpeg transcription successful: '{text[:50]}...'")
+        logger.debug("FFmpeg transcription successful: '%.50s...'", text)
         return text
         
     except sr.UnknownValueError:
         logger.warning("Could not understand audio after conversion")
         return None
     except Exception as e:
-        logger.error(f"FFmpeg transcription error: {e}")
+        logger.error("FFmpeg transcription error: %s", e)
         return None
     finally:
         # Clean up